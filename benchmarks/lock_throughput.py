@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the per-activity locks.
+
+Each thread signs a student up for an activity and then unregisters them,
+repeatedly. It calls the real endpoint functions, and thread ``i`` works on
+activity ``i % 9``. Every thread count is run twice:
+
+- ``single``: every activity goes through one shared lock (the baseline).
+- ``per-activity``: the app's own locking.
+
+Both setups go through the same lock wrapper, so their per-call overhead is
+identical. The list lookup and append inside the real critical section take
+well under a microsecond and are bound by the GIL, so by themselves they
+cannot show any scaling. The wrapper therefore holds each lock for an extra
+``--hold-ms`` (default 1ms, simulated with a sleep). This stands in for the
+work a real store would do while holding the lock, such as a database write.
+Pass ``--hold-ms 0`` to measure the bare critical section.
+
+With a hold time, single-lock throughput stays flat as threads are added.
+Per-activity throughput grows until there are more threads than activities,
+at which point threads that share an activity start to contend.
+
+Usage:
+    python benchmarks/lock_throughput.py [--ops 2000] [--hold-ms 1] [--threads 1 2 4 8 16]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import src.app as app_module  # noqa: E402
+
+
+class BenchmarkLocks(app_module.ActivityLocks):
+    """ActivityLocks that can share one lock and hold each lock for a while."""
+
+    def __init__(self, shared, hold):
+        super().__init__()
+        self.shared = shared
+        self.hold = hold
+
+    @contextmanager
+    def lock(self, activity_name):
+        with super().lock("*" if self.shared else activity_name):
+            if self.hold:
+                time.sleep(self.hold)
+            yield
+
+
+def run(locks, threads, ops):
+    """Return (operations per second, contended acquisitions) for one configuration."""
+    names = list(app_module.activities)
+    per_thread = max(ops // threads // 2, 1)
+    original = {name: list(details["participants"]) for name, details in app_module.activities.items()}
+    app_module.activity_locks = locks
+
+    def worker(index):
+        activity = names[index % len(names)]
+        for i in range(per_thread):
+            email = f"bench-{index}-{i}@mergington.edu"
+            app_module.signup_for_activity(activity, email)
+            app_module.unregister_from_activity(activity, email)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    for name, participants in original.items():
+        app_module.activities[name]["participants"] = participants
+
+    contended = sum(entry["contended"] for entry in locks.stats())
+    return per_thread * threads * 2 / elapsed, contended
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000, help="total signups plus unregisters per run")
+    parser.add_argument("--hold-ms", type=float, default=1.0, help="simulated time spent holding each lock")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+    hold = args.hold_ms / 1000
+
+    default_locks = app_module.activity_locks
+    print(f"hold time: {args.hold_ms}ms per lock (simulated)")
+    print(f"{'threads':>7} {'single ops/s':>13} {'contended':>10} "
+          f"{'per-activity ops/s':>19} {'contended':>10} {'speedup':>8}")
+    try:
+        for threads in args.threads:
+            single, single_contended = run(BenchmarkLocks(True, hold), threads, args.ops)
+            sharded, sharded_contended = run(BenchmarkLocks(False, hold), threads, args.ops)
+            print(f"{threads:>7} {single:>13.0f} {single_contended:>10} "
+                  f"{sharded:>19.0f} {sharded_contended:>10} {sharded / single:>7.1f}x")
+    finally:
+        app_module.activity_locks = default_locks
+
+
+if __name__ == "__main__":
+    main()
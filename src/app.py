@@ -7,17 +7,22 @@ for extracurricular activities at Mergington High School.
 
 from fastapi import FastAPI, HTTPException, Form
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
+from pydantic import BaseModel
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Literal
+import asyncio
+import json
+import logging
 import os
+import signal
+import tempfile
+import threading
+import time
 from pathlib import Path
 
-app = FastAPI(title="Mergington High School API",
-              description="API for viewing and signing up for extracurricular activities")
 
-# Mount the static files directory
-current_dir = Path(__file__).parent
-app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
-          "static")), name="static")
+logger = logging.getLogger(__name__)
 
 # In-memory activity database
 activities = {
@@ -78,6 +83,294 @@ activities = {
 }
 
 
+class ActivityLocks:
+    """One lock per activity for the activities database.
+
+    Mutations on different activities never share a lock. Locks are created
+    the first time an activity is touched, and per-activity counters record
+    how often the lock was contended and how long requests waited for and
+    held it.
+    """
+
+    def __init__(self):
+        self._registry_lock = threading.Lock()
+        self._entries = {}
+
+    @staticmethod
+    def _empty_stats():
+        return {"acquisitions": 0, "contended": 0, "wait_time": 0.0, "hold_time": 0.0}
+
+    def _entry(self, activity_name):
+        entry = self._entries.get(activity_name)
+        if entry is None:
+            with self._registry_lock:
+                entry = self._entries.setdefault(
+                    activity_name, (threading.Lock(), self._empty_stats()))
+        return entry
+
+    @contextmanager
+    def lock(self, activity_name):
+        """Hold the lock of ``activity_name``"""
+        activity_lock, stats = self._entry(activity_name)
+
+        start = time.perf_counter()
+        contended = not activity_lock.acquire(blocking=False)
+        if contended:
+            activity_lock.acquire()
+        acquired = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Counters are only written while the activity lock is held
+            stats["acquisitions"] += 1
+            stats["contended"] += contended
+            stats["wait_time"] += acquired - start
+            stats["hold_time"] += time.perf_counter() - acquired
+            activity_lock.release()
+
+    def stats(self, activity_names=()):
+        """Return a snapshot of the per-activity lock counters"""
+        names = list(activity_names)
+        names += [name for name in list(self._entries) if name not in names]
+
+        report = []
+        for name in names:
+            entry = self._entries.get(name)
+            stats = entry[1] if entry else self._empty_stats()
+            report.append({
+                "activity": name,
+                "acquisitions": stats["acquisitions"],
+                "contended": stats["contended"],
+                "wait_time_ms": round(stats["wait_time"] * 1000, 3),
+                "hold_time_ms": round(stats["hold_time"] * 1000, 3),
+            })
+        return report
+
+    def reset_stats(self):
+        """Zero the per-activity counters"""
+        for activity_lock, stats in list(self._entries.values()):
+            with activity_lock:
+                stats.update(self._empty_stats())
+
+
+# Locks guarding mutations of the activities database
+activity_locks = ActivityLocks()
+
+
+class WriteGate:
+    """Track in-flight writes and refuse new ones once shutdown begins"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def open(self):
+        with self._condition:
+            self._closed = False
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+
+    @contextmanager
+    def enter(self):
+        """Run a write, or reject it with 503 if the gate is closed"""
+        with self._condition:
+            if self._closed:
+                raise HTTPException(status_code=503, detail="Server is shutting down")
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def drain(self, timeout=None):
+        """Wait for in-flight writes to finish; return False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._in_flight == 0, timeout)
+
+
+class ActivitiesCache:
+    """Serialized ``/activities`` response, rebuilt after every change"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._body = None
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._body = None
+
+    def get(self):
+        with self._lock:
+            if self._body is not None:
+                return self._body
+            generation = self._generation
+
+        body = json.dumps(activities).encode("utf-8")
+
+        # Only keep the result if nothing changed while it was being built
+        with self._lock:
+            if generation == self._generation:
+                self._body = body
+        return body
+
+
+def dump_state(path):
+    """Write the participant lists to ``path`` as a compact JSON image
+
+    Each list is copied under its activity lock, so a write that is still
+    running cannot leave a half-updated list in the image.
+    """
+    participants = {}
+    for name in list(activities):
+        with activity_locks.lock(name):
+            participants[name] = list(activities[name]["participants"])
+
+    # A unique temp file per call, so workers saving at once never share one
+    directory, filename = os.path.split(os.path.abspath(path))
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory,
+                                         prefix=f"{filename}.", suffix=".tmp",
+                                         delete=False) as f:
+            tmp_path = f.name
+            json.dump({"participants": participants}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Could not save state image %s: %s", path, exc)
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def restore_state(path):
+    """Load participant lists from an image written by ``dump_state``
+
+    Activities missing from the image keep their defaults, and activities
+    in the image that no longer exist are ignored. An unreadable image is
+    logged and skipped so the app still starts with the default data.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            image = json.load(f)
+        participants = image["participants"]
+        for emails in participants.values():
+            if not isinstance(emails, list) or not all(isinstance(email, str) for email in emails):
+                raise TypeError("participants must be lists of emails")
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as exc:
+        logger.warning("Ignoring unreadable state image %s: %s", path, exc)
+        return
+
+    for name, emails in participants.items():
+        if name in activities:
+            activities[name]["participants"] = list(emails)
+    activities_cache.invalidate()
+
+
+# Lifecycle state shared by the endpoints and the lifespan hooks
+write_gate = WriteGate()
+activities_cache = ActivitiesCache()
+readiness = threading.Event()
+
+
+def drain_writes():
+    """Wait for in-flight writes, logging a warning if some are still running"""
+    timeout = float(os.environ.get("SHUTDOWN_DRAIN_TIMEOUT", "10"))
+    drained = write_gate.drain(timeout)
+    if not drained:
+        logger.warning("%d write(s) still running after %.1fs drain timeout",
+                       write_gate.in_flight, timeout)
+    return drained
+
+
+def begin_shutdown(signum, frame, forward):
+    """Withdraw readiness, then pass the signal on after a grace period
+
+    uvicorn closes its sockets as soon as it sees SIGTERM. This runs first
+    instead: ``/ready`` returns 503 so load balancers stop routing here, while
+    reads and writes keep being served for ``SHUTDOWN_GRACE_PERIOD`` seconds
+    (default 0, so ``--reload`` restarts are not delayed). ``forward``
+    (uvicorn's own handler) is then called from a background thread so the
+    event loop keeps serving in the meantime. Writes are refused and drained
+    in the lifespan shutdown, once uvicorn has stopped accepting connections.
+    A second signal is forwarded at once.
+    """
+    grace_period = float(os.environ.get("SHUTDOWN_GRACE_PERIOD", "0"))
+    if not readiness.is_set() or grace_period <= 0:
+        readiness.clear()
+        forward(signum, frame)
+        return None
+
+    readiness.clear()
+
+    def finish():
+        time.sleep(grace_period)
+        forward(signum, frame)
+
+    thread = threading.Thread(target=finish, daemon=True)
+    thread.start()
+    return thread
+
+
+def install_shutdown_handler():
+    """Route SIGTERM through ``begin_shutdown``; return the replaced handler
+
+    Returns None when nothing was installed, either because this is not the
+    main thread or because there is no Python handler to pass the signal to.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return None
+    previous = signal.getsignal(signal.SIGTERM)
+    if not callable(previous):
+        return None
+    signal.signal(signal.SIGTERM,
+                  lambda signum, frame: begin_shutdown(signum, frame, previous))
+    return previous
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Restore state and warm caches on startup, drain and dump it on shutdown"""
+    state_file = os.environ.get("ACTIVITIES_STATE_FILE")
+    if state_file:
+        restore_state(state_file)
+    activities_cache.get()
+    write_gate.open()
+    readiness.set()
+    previous_handler = install_shutdown_handler()
+
+    yield
+
+    if previous_handler is not None:
+        signal.signal(signal.SIGTERM, previous_handler)
+    readiness.clear()
+    write_gate.close()
+    await asyncio.to_thread(drain_writes)
+    if state_file:
+        dump_state(state_file)
+
+
+app = FastAPI(title="Mergington High School API",
+              description="API for viewing and signing up for extracurricular activities",
+              lifespan=lifespan)
+
+# Mount the static files directory
+current_dir = Path(__file__).parent
+app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
+          "static")), name="static")
+
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
@@ -85,7 +378,15 @@ def root():
 
 @app.get("/activities")
 def get_activities():
-    return activities
+    return Response(content=activities_cache.get(), media_type="application/json")
+
+
+@app.get("/ready")
+def get_readiness():
+    """Report whether startup has finished and the app is accepting traffic"""
+    if not readiness.is_set():
+        raise HTTPException(status_code=503, detail="Not ready")
+    return {"status": "ready"}
 
 
 @app.post("/activities/{activity_name}/signup")
@@ -98,12 +399,14 @@ def signup_for_activity(activity_name: str, email: str = Form(...)):
     # Get the specific activity
     activity = activities[activity_name]
 
-    # Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student already signed up for this activity")
+    with write_gate.enter(), activity_locks.lock(activity_name):
+        # Validate student is not already signed up
+        if email in activity["participants"]:
+            raise HTTPException(status_code=400, detail="Student already signed up for this activity")
 
-    # Add student
-    activity["participants"].append(email)
+        # Add student
+        activity["participants"].append(email)
+        activities_cache.invalidate()
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
@@ -117,10 +420,63 @@ def unregister_from_activity(activity_name: str, email: str):
     # Get the specific activity
     activity = activities[activity_name]
 
-    # Validate student is actually signed up
-    if email not in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student not registered for this activity")
+    with write_gate.enter(), activity_locks.lock(activity_name):
+        # Validate student is actually signed up
+        if email not in activity["participants"]:
+            raise HTTPException(status_code=400, detail="Student not registered for this activity")
 
-    # Remove student
-    activity["participants"].remove(email)
+        # Remove student
+        activity["participants"].remove(email)
+        activities_cache.invalidate()
     return {"message": f"Unregistered {email} from {activity_name}"}
+
+
+# Largest number of operations accepted in one batch request
+MAX_BATCH_SIZE = 50
+
+
+class Mutation(BaseModel):
+    """A single queued signup or unregister sent by the frontend"""
+    action: Literal["signup", "unregister"]
+    activity: str
+    email: str
+
+
+@app.post("/activities/batch")
+def apply_batch(mutations: List[Mutation]):
+    """Apply several signups and unregisters in one request
+
+    Operations run in order and independently; each gets its own status so
+    the client can retry only the ones that failed with a 5xx. Queued
+    operations may be replayed after the server already applied them, so a
+    signup that is already in place or an unregister that already happened
+    counts as success and is marked ``unchanged``.
+    """
+    if len(mutations) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {MAX_BATCH_SIZE} operations")
+
+    results = []
+    for mutation in mutations:
+        try:
+            if mutation.action == "signup":
+                result = signup_for_activity(mutation.activity, mutation.email)
+            else:
+                result = unregister_from_activity(mutation.activity, mutation.email)
+            results.append({"status": 200, **result})
+        except HTTPException as exc:
+            if exc.status_code == 400:
+                results.append({"status": 200, "message": exc.detail, "unchanged": True})
+            else:
+                results.append({"status": exc.status_code, "detail": exc.detail})
+    return {"results": results}
+
+
+@app.get("/debug/locks")
+def get_lock_stats():
+    """Report per-activity lock contention, wait time and hold time
+
+    Only available when ``DEBUG_LOCKS=1`` is set.
+    """
+    if os.environ.get("DEBUG_LOCKS") != "1":
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {"locks": activity_locks.stats(activities.keys())}
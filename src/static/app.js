@@ -1,14 +1,46 @@
+// Signups and unregisters that could not reach the server are kept here and
+// sent later through /activities/batch
+const QUEUE_KEY = "pendingMutations";
+const FLUSH_LOCK = "pendingMutationsFlush";
+const LEASE_MS = 30000;
+const BATCH_SIZE = 20;
+const QUEUE_DELAY_MS = 2000;
+const MIN_BACKOFF_MS = 1000;
+const MAX_BACKOFF_MS = 60000;
+const RETRYABLE_STATUSES = [429, 502, 503, 504];
+const REQUEST_TIMEOUT_MS = 10000;
+
+let backoffMs = MIN_BACKOFF_MS;
+let flushTimer = null;
+let flushing = false;
+const tabId = newId();
+
 document.addEventListener("DOMContentLoaded", () => {
   loadActivities();
 
   const signupForm = document.getElementById("signup-form");
   signupForm.addEventListener("submit", handleSignup);
+
+  if ("serviceWorker" in navigator) {
+    navigator.serviceWorker.register("sw.js").catch((error) => {
+      console.error("Error registering service worker:", error);
+    });
+    // The service worker sends a fresh snapshot after serving a stale one
+    navigator.serviceWorker.addEventListener("message", (event) => {
+      if (event.data && event.data.type === "activities-updated") {
+        displayActivities(event.data.activities);
+      }
+    });
+  }
+
+  window.addEventListener("online", () => flushQueue());
+  flushQueue();
 });
 
-// Load activities from the server
-async function loadActivities() {
+// Load activities from the server; fresh skips the service worker's cached copy
+async function loadActivities(fresh = false) {
   try {
-    const response = await fetch("/activities");
+    const response = await fetch("/activities", fresh ? { cache: "no-store" } : {});
     const activities = await response.json();
 
     displayActivities(activities);
@@ -76,8 +108,14 @@ async function handleSignup(event) {
     return;
   }
 
+  if (!navigator.onLine) {
+    queueMutation({ action: "signup", activity, email });
+    document.getElementById("signup-form").reset();
+    return;
+  }
+
   try {
-    const response = await fetch(`/activities/${encodeURIComponent(activity)}/signup`, {
+    const response = await fetchIfReachable(`/activities/${encodeURIComponent(activity)}/signup`, {
       method: "POST",
       headers: {
         "Content-Type": "application/x-www-form-urlencoded",
@@ -85,12 +123,18 @@ async function handleSignup(event) {
       body: `email=${encodeURIComponent(email)}`,
     });
 
+    if (response === null || RETRYABLE_STATUSES.includes(response.status)) {
+      queueMutation({ action: "signup", activity, email });
+      document.getElementById("signup-form").reset();
+      return;
+    }
+
     const data = await response.json();
 
     if (response.ok) {
       showMessage(data.message, "success");
       document.getElementById("signup-form").reset();
-      loadActivities(); // Reload to show updated participant list
+      loadActivities(true); // Reload to show updated participant list
     } else {
       showMessage(data.detail, "error");
     }
@@ -106,16 +150,26 @@ async function unregisterParticipant(activityName, email) {
     return;
   }
 
+  if (!navigator.onLine) {
+    queueMutation({ action: "unregister", activity: activityName, email });
+    return;
+  }
+
   try {
-    const response = await fetch(`/activities/${encodeURIComponent(activityName)}/participants/${encodeURIComponent(email)}`, {
+    const response = await fetchIfReachable(`/activities/${encodeURIComponent(activityName)}/participants/${encodeURIComponent(email)}`, {
       method: "DELETE",
     });
 
+    if (response === null || RETRYABLE_STATUSES.includes(response.status)) {
+      queueMutation({ action: "unregister", activity: activityName, email });
+      return;
+    }
+
     const data = await response.json();
 
     if (response.ok) {
       showMessage(data.message, "success");
-      loadActivities(); // Reload to show updated participant list
+      loadActivities(true); // Reload to show updated participant list
     } else {
       showMessage(data.detail, "error");
     }
@@ -125,6 +179,183 @@ async function unregisterParticipant(activityName, email) {
   }
 }
 
+// Abort signal that fires after REQUEST_TIMEOUT_MS, so a hung server counts as unreachable
+function timeoutSignal() {
+  if (AbortSignal.timeout) {
+    return AbortSignal.timeout(REQUEST_TIMEOUT_MS);
+  }
+  const controller = new AbortController();
+  setTimeout(() => controller.abort(), REQUEST_TIMEOUT_MS);
+  return controller.signal;
+}
+
+// Fetch a URL, returning null when the server could not be reached in time
+async function fetchIfReachable(url, options) {
+  try {
+    return await fetch(url, { ...options, signal: timeoutSignal() });
+  } catch (error) {
+    // fetch rejects with a TypeError on network failures, and with a
+    // TimeoutError/AbortError when the timeout signal fires
+    if (error instanceof TypeError || error.name === "TimeoutError" || error.name === "AbortError") {
+      console.warn("Network unavailable:", error);
+      return null;
+    }
+    throw error;
+  }
+}
+
+// Generate an id for a queued mutation or for this tab
+function newId() {
+  if (window.crypto && crypto.randomUUID) {
+    return crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+// Read the pending mutation queue from local storage
+function loadQueue() {
+  try {
+    return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+  } catch (error) {
+    return [];
+  }
+}
+
+// Write the pending mutation queue to local storage
+function saveQueue(queue) {
+  localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+}
+
+// Drop sent entries by id; other tabs may have changed the queue meanwhile
+function removeFromQueue(ids) {
+  saveQueue(loadQueue().filter((entry) => !ids.has(entry.id)));
+}
+
+// Keep a signup or unregister to send once the server is reachable
+function queueMutation(mutation) {
+  saveQueue([...loadQueue(), { id: newId(), ...mutation }]);
+
+  const verb = mutation.action === "signup" ? "Sign-up" : "Removal";
+  showMessage(`${verb} of ${mutation.email} saved; it will be sent when the connection returns`, "info");
+  scheduleFlush(QUEUE_DELAY_MS);
+}
+
+// Flush the queue after a delay, unless a flush is already scheduled
+function scheduleFlush(delayMs) {
+  if (flushTimer !== null) {
+    return;
+  }
+  flushTimer = setTimeout(() => {
+    flushTimer = null;
+    flushQueue();
+  }, delayMs);
+}
+
+// Run fn while no other tab is flushing; returns null if another tab is
+async function withFlushLock(fn) {
+  if (navigator.locks) {
+    return navigator.locks.request(FLUSH_LOCK, { ifAvailable: true }, (lock) => (lock ? fn() : null));
+  }
+
+  // Without Web Locks, fall back to a time-limited lease in local storage
+  const lease = JSON.parse(localStorage.getItem(FLUSH_LOCK) || "null");
+  if (lease && lease.owner !== tabId && lease.expires > Date.now()) {
+    return null;
+  }
+  localStorage.setItem(FLUSH_LOCK, JSON.stringify({ owner: tabId, expires: Date.now() + LEASE_MS }));
+  try {
+    return await fn();
+  } finally {
+    const current = JSON.parse(localStorage.getItem(FLUSH_LOCK) || "null");
+    if (current && current.owner === tabId) {
+      localStorage.removeItem(FLUSH_LOCK);
+    }
+  }
+}
+
+// Return the current backoff delay and double it for the next failure
+function nextBackoff() {
+  const delayMs = backoffMs;
+  backoffMs = Math.min(backoffMs * 2, MAX_BACKOFF_MS);
+  return delayMs;
+}
+
+// Send queued mutations to the server in batches, backing off on failure
+async function flushQueue() {
+  if (flushing || !navigator.onLine) {
+    return;
+  }
+
+  flushing = true;
+  let retryDelayMs;
+  try {
+    retryDelayMs = await withFlushLock(sendQueuedBatch);
+  } finally {
+    flushing = false;
+  }
+
+  if (loadQueue().length > 0) {
+    // Retry after the backoff delay, or, if another tab held the flush lock,
+    // check back shortly in case that tab closes
+    scheduleFlush(retryDelayMs === null ? QUEUE_DELAY_MS : retryDelayMs);
+  }
+}
+
+// Send the oldest queued mutations; returns the delay before the next attempt
+async function sendQueuedBatch() {
+  const batch = loadQueue().slice(0, BATCH_SIZE);
+  if (batch.length === 0) {
+    return 0;
+  }
+
+  try {
+    const response = await fetch("/activities/batch", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(batch.map(({ id, ...mutation }) => mutation)),
+      signal: timeoutSignal(),
+    });
+
+    if (RETRYABLE_STATUSES.includes(response.status)) {
+      throw new Error(`Server busy (${response.status})`);
+    }
+
+    const retryIds = new Set();
+    if (response.ok) {
+      const { results } = await response.json();
+      batch.forEach((entry, i) => {
+        if (RETRYABLE_STATUSES.includes(results[i].status)) {
+          retryIds.add(entry.id);
+        }
+      });
+
+      const rejected = results.filter((result) => result.status !== 200 && !RETRYABLE_STATUSES.includes(result.status));
+      if (rejected.length > 0) {
+        showMessage(rejected.map((result) => result.detail).join("; "), "error");
+      } else if (retryIds.size < batch.length) {
+        showMessage(`Sent ${batch.length - retryIds.size} saved change(s)`, "success");
+      }
+    } else {
+      // The batch itself was rejected; retrying it unchanged would never succeed
+      showMessage("Some saved changes could not be sent", "error");
+    }
+
+    removeFromQueue(new Set(batch.filter((entry) => !retryIds.has(entry.id)).map((entry) => entry.id)));
+    loadActivities(true);
+
+    if (retryIds.size > 0) {
+      return nextBackoff();
+    }
+    backoffMs = MIN_BACKOFF_MS;
+    return 0;
+  } catch (error) {
+    console.error("Error sending saved changes:", error);
+    return nextBackoff();
+  }
+}
+
 // Show a message to the user
 function showMessage(text, type) {
   const messageDiv = document.getElementById("message");
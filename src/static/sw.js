@@ -0,0 +1,90 @@
+// Service worker: serves static assets and the last /activities snapshot from
+// cache (stale-while-revalidate) so the page keeps working on network blips.
+const CACHE_NAME = "mergington-v2";
+const STATIC_ASSETS = ["index.html", "app.js", "styles.css"];
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(CACHE_NAME).then((cache) => cache.addAll(STATIC_ASSETS))
+  );
+  self.skipWaiting();
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(names.filter((name) => name !== CACHE_NAME).map((name) => caches.delete(name)))
+      )
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener("fetch", (event) => {
+  const url = new URL(event.request.url);
+
+  // Only cache reads from our own origin; mutations always go to the network
+  if (event.request.method !== "GET" || url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (url.pathname === "/activities" && event.request.cache === "no-store") {
+    // The page just changed something and needs the current list
+    event.respondWith(networkFirst(event.request));
+  } else if (url.pathname === "/activities") {
+    event.respondWith(staleWhileRevalidate(event, true));
+  } else if (url.pathname.startsWith("/static/")) {
+    event.respondWith(staleWhileRevalidate(event, false));
+  }
+});
+
+// Answer from the network and refresh the cache, falling back to the cache offline
+async function networkFirst(request) {
+  const cache = await caches.open(CACHE_NAME);
+  try {
+    const response = await fetch(request);
+    if (response.ok) {
+      // Store under the plain URL so later stale-while-revalidate reads see it
+      await cache.put(request.url, response.clone());
+    }
+    return response;
+  } catch (error) {
+    const cached = await cache.match(request.url);
+    if (cached) {
+      return cached;
+    }
+    throw error;
+  }
+}
+
+// Answer from cache right away and refresh the cached copy in the background
+async function staleWhileRevalidate(event, notifyClients) {
+  const cache = await caches.open(CACHE_NAME);
+  const cached = await cache.match(event.request);
+
+  const revalidate = fetch(event.request).then(async (response) => {
+    if (!response.ok) {
+      return response;
+    }
+
+    const fresh = await response.clone().text();
+    const previous = cached ? await cached.clone().text() : null;
+    await cache.put(event.request, response.clone());
+
+    // Let open pages re-render if they were shown a stale snapshot
+    if (notifyClients && cached && fresh !== previous) {
+      const clients = await self.clients.matchAll();
+      for (const client of clients) {
+        client.postMessage({ type: "activities-updated", activities: JSON.parse(fresh) });
+      }
+    }
+    return response;
+  });
+
+  if (cached) {
+    event.waitUntil(revalidate.catch(() => {}));
+    return cached;
+  }
+  return revalidate;
+}
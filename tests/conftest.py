@@ -4,7 +4,7 @@ Pytest configuration and fixtures for the Mergington High School API tests.
 
 import pytest
 from fastapi.testclient import TestClient
-from src.app import app, activities
+from src.app import app, activities, activities_cache
 
 
 @pytest.fixture
@@ -77,12 +77,14 @@ def reset_activities():
     # Reset activities to original state
     activities.clear()
     activities.update(original_activities)
+    activities_cache.invalidate()
     
     yield
     
     # Clean up after test
     activities.clear()
     activities.update(original_activities)
+    activities_cache.invalidate()
 
 
 @pytest.fixture
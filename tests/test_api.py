@@ -167,6 +167,75 @@ class TestActivityUnregistration:
         assert response.status_code == status.HTTP_200_OK
 
 
+class TestBatchMutations:
+    """Test the batch endpoint used to flush queued changes."""
+
+    def test_batch_applies_operations_in_order(self, client, reset_activities, valid_email):
+        """Test that a signup followed by an unregister both apply."""
+        response = client.post("/activities/batch", json=[
+            {"action": "signup", "activity": "Chess Club", "email": valid_email},
+            {"action": "signup", "activity": "Drama Club", "email": valid_email},
+            {"action": "unregister", "activity": "Chess Club", "email": valid_email},
+        ])
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.json()["results"]
+        assert [result["status"] for result in results] == [200, 200, 200]
+        assert results[2]["message"] == f"Unregistered {valid_email} from Chess Club"
+
+        data = client.get("/activities").json()
+        assert valid_email not in data["Chess Club"]["participants"]
+        assert valid_email in data["Drama Club"]["participants"]
+
+    def test_batch_reports_failures_per_operation(self, client, reset_activities, valid_email):
+        """Test that one failing operation does not stop the others."""
+        response = client.post("/activities/batch", json=[
+            {"action": "signup", "activity": "Nonexistent Club", "email": valid_email},
+            {"action": "signup", "activity": "Chess Club", "email": "michael@mergington.edu"},
+            {"action": "signup", "activity": "Chess Club", "email": valid_email},
+        ])
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.json()["results"]
+        assert results[0] == {"status": 404, "detail": "Activity not found"}
+        assert results[1]["status"] == 200
+        assert results[2]["status"] == 200
+
+    def test_batch_replay_is_idempotent(self, client, reset_activities, valid_email):
+        """Test that replaying an already-applied change is reported as success."""
+        mutations = [
+            {"action": "signup", "activity": "Chess Club", "email": valid_email},
+            {"action": "unregister", "activity": "Drama Club", "email": "lily@mergington.edu"},
+        ]
+        client.post("/activities/batch", json=mutations)
+
+        response = client.post("/activities/batch", json=mutations)
+        results = response.json()["results"]
+        assert results[0] == {
+            "status": 200, "message": "Student already signed up for this activity", "unchanged": True,
+        }
+        assert results[1] == {
+            "status": 200, "message": "Student not registered for this activity", "unchanged": True,
+        }
+
+        data = client.get("/activities").json()
+        assert data["Chess Club"]["participants"].count(valid_email) == 1
+        assert "lily@mergington.edu" not in data["Drama Club"]["participants"]
+
+    def test_batch_size_limit(self, client):
+        """Test that oversized batches are rejected."""
+        mutation = {"action": "signup", "activity": "Chess Club", "email": "a@mergington.edu"}
+        response = client.post("/activities/batch", json=[mutation] * 51)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_rejects_unknown_action(self, client):
+        """Test that only signup and unregister are accepted."""
+        response = client.post("/activities/batch", json=[
+            {"action": "delete", "activity": "Chess Club", "email": "a@mergington.edu"},
+        ])
+        assert response.status_code == 422  # HTTP_422_UNPROCESSABLE_CONTENT
+
+
 class TestIntegrationWorkflow:
     """Integration tests for complete workflows."""
 
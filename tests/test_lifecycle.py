@@ -0,0 +1,268 @@
+"""
+Tests for startup/shutdown hooks, write draining and the readiness endpoint.
+"""
+
+import json
+import logging
+import signal
+import threading
+
+import pytest
+from fastapi import HTTPException, status
+from fastapi.testclient import TestClient
+
+from src.app import (
+    app, activities, activity_locks, readiness, write_gate, WriteGate,
+    begin_shutdown, drain_writes, dump_state, install_shutdown_handler, restore_state,
+)
+
+
+@pytest.fixture
+def lifecycle():
+    """Restore the shared lifecycle state after a test has run a shutdown."""
+    yield
+    write_gate.open()
+    readiness.clear()
+
+
+class TestReadiness:
+    """Test the readiness endpoint across the app lifecycle."""
+
+    def test_not_ready_before_startup(self, client):
+        """Test that readiness fails until the lifespan startup has run."""
+        response = client.get("/ready")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_ready_after_startup(self, reset_activities, lifecycle):
+        """Test that readiness succeeds while the app is running."""
+        with TestClient(app) as client:
+            response = client.get("/ready")
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json() == {"status": "ready"}
+
+        # Shutdown withdraws readiness again
+        assert TestClient(app).get("/ready").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+class TestStateHandoff:
+    """Test dumping state on shutdown and restoring it on startup."""
+
+    def test_state_survives_restart(self, reset_activities, lifecycle, monkeypatch, tmp_path, valid_email):
+        """Test that a signup made before shutdown is present after startup."""
+        state_file = tmp_path / "state.json"
+        monkeypatch.setenv("ACTIVITIES_STATE_FILE", str(state_file))
+
+        with TestClient(app) as client:
+            client.post("/activities/Chess Club/signup", data={"email": valid_email})
+        assert state_file.exists()
+
+        # Simulate the fresh in-memory data of a new process
+        activities["Chess Club"]["participants"] = ["michael@mergington.edu", "daniel@mergington.edu"]
+
+        with TestClient(app) as client:
+            data = client.get("/activities").json()
+            assert valid_email in data["Chess Club"]["participants"]
+
+    def test_restore_ignores_unknown_activities(self, reset_activities, tmp_path):
+        """Test that activities missing from the current tree are skipped."""
+        state_file = tmp_path / "state.json"
+        state_file.write_text(json.dumps({"participants": {
+            "Retired Club": ["old@mergington.edu"],
+            "Drama Club": ["lily@mergington.edu"],
+        }}))
+
+        restore_state(str(state_file))
+        assert "Retired Club" not in activities
+        assert activities["Drama Club"]["participants"] == ["lily@mergington.edu"]
+        assert activities["Chess Club"]["participants"] == ["michael@mergington.edu", "daniel@mergington.edu"]
+
+    def test_restore_without_image(self, reset_activities, tmp_path):
+        """Test that a missing state image leaves the defaults untouched."""
+        restore_state(str(tmp_path / "missing.json"))
+        assert len(activities["Chess Club"]["participants"]) == 2
+
+    def test_dump_is_compact(self, reset_activities, tmp_path):
+        """Test that the state image only stores participant lists."""
+        state_file = tmp_path / "state.json"
+        dump_state(str(state_file))
+
+        image = json.loads(state_file.read_text())
+        assert set(image) == {"participants"}
+        assert image["participants"]["Chess Club"] == activities["Chess Club"]["participants"]
+        assert '", "' not in state_file.read_text()
+
+    def test_dump_waits_for_activity_lock(self, reset_activities, tmp_path):
+        """Test that a list being changed is not copied mid-write."""
+        state_file = tmp_path / "state.json"
+        dumper = threading.Thread(target=dump_state, args=(str(state_file),))
+
+        with activity_locks.lock("Chess Club"):
+            dumper.start()
+            dumper.join(timeout=0.05)
+            assert dumper.is_alive()
+            activities["Chess Club"]["participants"].append("late@mergington.edu")
+        dumper.join()
+
+        image = json.loads(state_file.read_text())
+        assert "late@mergington.edu" in image["participants"]["Chess Club"]
+
+    def test_dump_failure_is_logged(self, reset_activities, tmp_path, caplog):
+        """Test that a state image that cannot be written does not raise."""
+        state_file = tmp_path / "missing-dir" / "state.json"
+
+        with caplog.at_level(logging.WARNING, logger="src.app"):
+            dump_state(str(state_file))
+
+        assert "Could not save state image" in caplog.text
+        assert not state_file.exists()
+
+    def test_concurrent_dumps_do_not_collide(self, reset_activities, tmp_path):
+        """Test that workers saving at the same time each use their own temp file."""
+        state_file = tmp_path / "state.json"
+        threads = [threading.Thread(target=dump_state, args=(str(state_file),)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert json.loads(state_file.read_text())["participants"]["Chess Club"]
+        assert [path.name for path in tmp_path.iterdir()] == ["state.json"]
+
+    @pytest.mark.parametrize("content", [
+        '{"participants": {"Chess Club": ["a@mergington.edu"',
+        '["not", "an", "object"]',
+        '{"participants": {"Chess Club": "a@mergington.edu"}}',
+        '{"other": {}}',
+    ])
+    def test_restore_falls_back_on_bad_image(self, reset_activities, tmp_path, caplog, content):
+        """Test that a corrupt image is logged and the defaults are kept."""
+        state_file = tmp_path / "state.json"
+        state_file.write_text(content)
+
+        with caplog.at_level(logging.WARNING, logger="src.app"):
+            restore_state(str(state_file))
+
+        assert "Ignoring unreadable state image" in caplog.text
+        assert activities["Chess Club"]["participants"] == ["michael@mergington.edu", "daniel@mergington.edu"]
+
+
+class TestGracefulShutdown:
+    """Test that shutdown is visible to clients before the server stops."""
+
+    def test_begin_shutdown_keeps_serving_during_grace_period(
+            self, client, reset_activities, lifecycle, monkeypatch, valid_email):
+        """Test that only readiness fails while the load balancer catches up."""
+        monkeypatch.setenv("SHUTDOWN_GRACE_PERIOD", "0.2")
+        forwarded = threading.Event()
+        readiness.set()
+
+        thread = begin_shutdown(signal.SIGTERM, None, lambda signum, frame: forwarded.set())
+
+        assert client.get("/ready").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        response = client.post("/activities/Chess Club/signup", data={"email": valid_email})
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get("/activities").status_code == status.HTTP_200_OK
+        assert not forwarded.is_set()
+
+        thread.join()
+        assert forwarded.is_set()
+
+    def test_no_grace_period_by_default(self, lifecycle, monkeypatch):
+        """Test that without SHUTDOWN_GRACE_PERIOD (e.g. --reload) the signal is not delayed."""
+        monkeypatch.delenv("SHUTDOWN_GRACE_PERIOD", raising=False)
+        forwarded = []
+        readiness.set()
+
+        assert begin_shutdown(signal.SIGTERM, None, lambda signum, frame: forwarded.append(signum)) is None
+        assert forwarded == [signal.SIGTERM]
+        assert not readiness.is_set()
+
+    def test_second_signal_is_forwarded_at_once(self, lifecycle):
+        """Test that a repeated signal skips the grace period."""
+        forwarded = []
+        assert begin_shutdown(signal.SIGTERM, None, lambda signum, frame: forwarded.append(signum)) is None
+        assert forwarded == [signal.SIGTERM]
+
+    def test_sigterm_goes_through_handler(self, lifecycle, monkeypatch):
+        """Test that a real SIGTERM withdraws readiness, then reaches the old handler."""
+        monkeypatch.setenv("SHUTDOWN_GRACE_PERIOD", "0")
+        forwarded = threading.Event()
+        original = signal.signal(signal.SIGTERM, lambda signum, frame: forwarded.set())
+        try:
+            previous = install_shutdown_handler()
+            assert previous is not None
+            readiness.set()
+
+            signal.raise_signal(signal.SIGTERM)
+            assert not readiness.is_set()
+            assert forwarded.wait(timeout=2)
+        finally:
+            signal.signal(signal.SIGTERM, original)
+
+    def test_drain_timeout_is_logged(self, lifecycle, monkeypatch, caplog):
+        """Test that writes still running after the drain timeout are reported."""
+        monkeypatch.setenv("SHUTDOWN_DRAIN_TIMEOUT", "0.01")
+        release = threading.Event()
+        started = threading.Event()
+
+        def write():
+            with write_gate.enter():
+                started.set()
+                release.wait()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        started.wait()
+        with caplog.at_level(logging.WARNING, logger="src.app"):
+            assert drain_writes() is False
+        release.set()
+        thread.join()
+
+        assert "still running" in caplog.text
+
+
+class TestWriteGate:
+    """Test rejecting and draining writes during shutdown."""
+
+    def test_closed_gate_rejects_writes(self):
+        """Test that new writes get a 503 once the gate is closed."""
+        gate = WriteGate()
+        gate.close()
+        with pytest.raises(HTTPException) as exc_info:
+            with gate.enter():
+                pass
+        assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_drain_waits_for_in_flight_writes(self):
+        """Test that draining blocks until running writes finish."""
+        gate = WriteGate()
+        started = threading.Event()
+        finish = threading.Event()
+
+        def write():
+            with gate.enter():
+                started.set()
+                finish.wait()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        started.wait()
+        gate.close()
+
+        assert gate.drain(timeout=0.01) is False
+        finish.set()
+        assert gate.drain(timeout=1) is True
+        assert gate.in_flight == 0
+        thread.join()
+
+
+class TestActivitiesCache:
+    """Test that the serialized activities response stays current."""
+
+    def test_cache_reflects_signups(self, client, reset_activities, valid_email):
+        """Test that a cached response is refreshed after a signup."""
+        client.get("/activities")
+        client.post("/activities/Art Studio/signup", data={"email": valid_email})
+
+        data = client.get("/activities").json()
+        assert valid_email in data["Art Studio"]["participants"]
@@ -0,0 +1,114 @@
+"""
+Tests for the per-activity locks and the lock diagnostics endpoint.
+"""
+
+import threading
+
+from fastapi import status
+
+from src.app import ActivityLocks, activities, activity_locks
+
+
+class TestActivityLocks:
+    """Test the ActivityLocks container."""
+
+    def test_each_activity_has_its_own_lock(self, reset_activities):
+        """Test that no two activities share a lock."""
+        locks = ActivityLocks()
+        # Every thread holds its activity's lock until all of them hold one;
+        # two activities sharing a lock would break the barrier
+        barrier = threading.Barrier(len(activities), timeout=2)
+        errors = []
+
+        def hold(name):
+            with locks.lock(name):
+                try:
+                    barrier.wait()
+                except threading.BrokenBarrierError as exc:
+                    errors.append(exc)
+
+        threads = [threading.Thread(target=hold, args=(name,)) for name in activities]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert all(entry["contended"] == 0 for entry in locks.stats(activities))
+
+    def test_lock_records_acquisitions(self):
+        """Test that holding a lock updates only that activity's counters."""
+        locks = ActivityLocks()
+        with locks.lock("Chess Club"):
+            pass
+
+        stats = {entry["activity"]: entry for entry in locks.stats(["Chess Club", "Drama Club"])}
+        assert stats["Chess Club"]["acquisitions"] == 1
+        assert stats["Drama Club"]["acquisitions"] == 0
+
+    def test_different_activities_do_not_contend(self):
+        """Test that a held lock does not block another activity."""
+        locks = ActivityLocks()
+        with locks.lock("Chess Club"):
+            with locks.lock("Drama Club"):
+                pass
+        assert all(entry["contended"] == 0 for entry in locks.stats())
+
+    def test_contention_is_counted(self):
+        """Test that waiting on a held lock is reported as contention."""
+        locks = ActivityLocks()
+        held = threading.Event()
+        release = threading.Event()
+
+        def holder():
+            with locks.lock("Chess Club"):
+                held.set()
+                release.wait()
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        held.wait()
+        threading.Timer(0.05, release.set).start()
+        with locks.lock("Chess Club"):
+            pass
+        thread.join()
+
+        stats = locks.stats()[0]
+        assert stats["acquisitions"] == 2
+        assert stats["contended"] == 1
+        assert stats["wait_time_ms"] > 0
+
+    def test_reset_stats(self):
+        """Test that counters can be zeroed."""
+        locks = ActivityLocks()
+        with locks.lock("Chess Club"):
+            pass
+        locks.reset_stats()
+        assert all(entry["acquisitions"] == 0 for entry in locks.stats())
+
+
+class TestLockStatsEndpoint:
+    """Test the lock diagnostics endpoint."""
+
+    def test_lock_stats_hidden_by_default(self, client, monkeypatch):
+        """Test that the endpoint is only exposed when DEBUG_LOCKS=1."""
+        monkeypatch.delenv("DEBUG_LOCKS", raising=False)
+        response = client.get("/debug/locks")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_lock_stats_report_signups(self, client, reset_activities, monkeypatch, valid_email):
+        """Test that signups show up in the per-activity counters."""
+        monkeypatch.setenv("DEBUG_LOCKS", "1")
+        activity_locks.reset_stats()
+        client.post("/activities/Chess Club/signup", data={"email": valid_email})
+        client.delete(f"/activities/Chess Club/participants/{valid_email}")
+
+        response = client.get("/debug/locks")
+        assert response.status_code == status.HTTP_200_OK
+
+        locks = {entry["activity"]: entry for entry in response.json()["locks"]}
+        assert set(locks) == set(client.get("/activities").json())
+        assert locks["Chess Club"]["acquisitions"] == 2
+        assert locks["Drama Club"]["acquisitions"] == 0
+        for key in ("contended", "wait_time_ms", "hold_time_ms"):
+            assert key in locks["Chess Club"]